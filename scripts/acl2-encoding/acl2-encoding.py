@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Run the ACL2 encoding migration phases as subcommands.
+
+Usage:
+    python3 acl2-encoding.py COMMAND [OPTIONS] [ACL2_DIR]
+
+Commands:
+    scan      Report non-ASCII bytes (same as scan-non-ascii.py)
+    fix       Convert comments to UTF-8 (same as fix-comment-encoding.py)
+    verify    Check files are valid UTF-8 (same as verify-encoding.py)
+    all       Fix, then verify, opening each file only once; writes
+              nothing unless --apply is given
+
+Run python3 acl2-encoding.py COMMAND --help for a command's options.
+"""
+
+import sys
+
+from acl2_encoding import fix, pipeline, scan, verify
+
+
+COMMANDS = {
+    'scan': scan.main,
+    'fix': fix.main,
+    'verify': verify.main,
+    'all': pipeline.main,
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print(__doc__, file=sys.stderr)
+        sys.exit(0 if sys.argv[1:2] in (['-h'], ['--help']) else 2)
+    cmd = sys.argv[1]
+    COMMANDS[cmd](sys.argv[2:], prog=f'acl2-encoding.py {cmd}')
+
+
+if __name__ == '__main__':
+    main()
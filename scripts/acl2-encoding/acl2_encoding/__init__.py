@@ -0,0 +1,9 @@
+"""Shared code for the ACL2 ISO-8859-1 to UTF-8 migration scripts.
+
+core holds the pieces every phase needs (source file discovery, ASCII and
+UTF-8 classification, UTF-8 diagnosis, the verdict cache).  The phases
+themselves live in scan, fix, and verify; scan-non-ascii.py,
+fix-comment-encoding.py, and verify-encoding.py are thin wrappers around
+them, and acl2-encoding.py runs any of them, or fix and verify in one pass
+(pipeline), as subcommands.
+"""
@@ -0,0 +1,286 @@
+"""Source discovery, encoding classification, and the verdict cache.
+
+Everything here is shared by the scan, fix, and verify phases, so each
+optimization (single tree walk, chunked ASCII test, linear UTF-8
+diagnosis, size/mtime cache) is implemented once.
+"""
+
+import os
+import re
+import json
+from collections import Counter
+
+
+# Suffixes of the Lisp source files to check
+SOURCE_EXTENSIONS = ('.lisp', '.lsp', '.acl2', '.cl')
+
+# Window size used by quick_classify()
+CHUNK_SIZE = 1 << 20
+
+# Per-file verdicts from earlier runs, keyed by absolute path.  A verdict
+# is 'ascii', 'utf8', 'latin1' (not valid UTF-8), or 'fixed': rewritten by
+# the fixer but still not valid UTF-8 because of non-ASCII bytes in code.
+# A fixed file's comments are already UTF-8 and must not be converted again.
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'acl2-encoding',
+                          'scan.json')
+
+# Matches any single byte outside the 7-bit ASCII range
+NON_ASCII_RE = re.compile(rb'[\x80-\xff]')
+
+# Passed as the delete argument of bytes.translate() to strip ASCII bytes
+ASCII_BYTES = bytes(range(128))
+
+# One well-formed non-ASCII UTF-8 sequence (Unicode Table 3-7), or else
+# (group 1) a byte that cannot start one, plus any continuation bytes
+# following it.  Scanning with this is a linear UTF-8 DFA run by the
+# regex engine.
+UTF8_SEQUENCE_RE = re.compile(
+    rb'[\xc2-\xdf][\x80-\xbf]'
+    rb'|\xe0[\xa0-\xbf][\x80-\xbf]'
+    rb'|[\xe1-\xec\xee\xef][\x80-\xbf]{2}'
+    rb'|\xed[\x80-\x9f][\x80-\xbf]'
+    rb'|\xf0[\x90-\xbf][\x80-\xbf]{2}'
+    rb'|[\xf1-\xf3][\x80-\xbf]{3}'
+    rb'|\xf4[\x80-\x8f][\x80-\xbf]{2}'
+    rb'|([\x80-\xff])[\x80-\xbf]*')
+
+
+def iter_source_files(acl2_dir, exclude_dirs=()):
+    """Yield the Lisp source files under acl2_dir, in walk order.
+
+    Walks the tree once, filtering on suffix as it goes.  Directories whose
+    path relative to acl2_dir (with trailing /) starts with one of
+    exclude_dirs are pruned from the walk rather than filtered afterwards.
+    Like the recursive glob it replaces, hidden files and directories are
+    skipped and symlinked directories are followed.
+    """
+    exclude_dirs = tuple(exclude_dirs)
+    for dirpath, dirnames, filenames in os.walk(acl2_dir, followlinks=True):
+        if exclude_dirs:
+            reldir = os.path.relpath(dirpath, acl2_dir)
+            prefix = '' if reldir == '.' else reldir + '/'
+            dirnames[:] = [d for d in dirnames
+                           if not (prefix + d + '/').startswith(exclude_dirs)]
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        yield from (os.path.join(dirpath, name) for name in filenames
+                    if name.endswith(SOURCE_EXTENSIONS)
+                    and not name.startswith('.'))
+
+
+def find_source_files(acl2_dir, exclude_dirs=()):
+    """Return the sorted list of Lisp source files under acl2_dir."""
+    return sorted(iter_source_files(acl2_dir, exclude_dirs))
+
+
+def with_relpaths(acl2_dir, files):
+    """Pair each path from find_source_files(acl2_dir) with its relative path.
+
+    Every such path starts with acl2_dir, so the relative path is a slice
+    rather than an os.path.relpath() call per file.
+    """
+    prefix_len = len(os.path.join(acl2_dir, ''))
+    return [(fpath, fpath[prefix_len:]) for fpath in files]
+
+
+def quick_classify(fpath):
+    """Return ('ascii', None) or ('maybe_nonascii', data) for fpath.
+
+    data is the raw bytes of a file with a non-ASCII byte, so callers need
+    not read it again.  Files of up to CHUNK_SIZE bytes, which is nearly
+    all of them, are read in one call.  Larger files are read CHUNK_SIZE
+    bytes at a time, so clean ones are never held whole; at the first
+    chunk with a non-ASCII byte the file is read whole from the start.
+    """
+    with open(fpath, 'rb') as f:
+        chunk = f.read(CHUNK_SIZE + 1)
+        if len(chunk) <= CHUNK_SIZE:
+            if chunk.isascii():
+                return 'ascii', None
+            return 'maybe_nonascii', chunk
+        while chunk:
+            if not chunk.isascii():
+                f.seek(0)
+                return 'maybe_nonascii', f.read()
+            chunk = f.read(CHUNK_SIZE)
+    return 'ascii', None
+
+
+def non_ascii_offsets(data):
+    """Return the position of every non-ASCII byte in data."""
+    return [m.start() for m in NON_ASCII_RE.finditer(data)]
+
+
+def classify(data, want_offsets=False):
+    """Return (verdict, offsets) for the raw bytes data.
+
+    verdict is 'ascii', 'utf8', or 'latin1' (not valid UTF-8, so taken to
+    be ISO-8859-1).  offsets is non_ascii_offsets(data) if want_offsets is
+    true, and None otherwise, so callers that only need the verdict don't
+    pay for the scan.
+    """
+    if data.isascii():
+        return 'ascii', [] if want_offsets else None
+    try:
+        data.decode('utf-8')
+        verdict = 'utf8'
+    except UnicodeDecodeError:
+        verdict = 'latin1'
+    return verdict, non_ascii_offsets(data) if want_offsets else None
+
+
+def check_utf8(data):
+    """Return (verdict, diagnose_utf8(data)), decoding data only once."""
+    if data.isascii():
+        return 'ascii', []
+    problems = diagnose_utf8(data)
+    return ('latin1' if problems else 'utf8'), problems
+
+
+def diagnose_utf8(data):
+    """Return the locations of the bytes in data that are not valid UTF-8.
+
+    Each problem is a dict with 'line', 'col' (0-based), 'byte', 'char_iso',
+    and 'context'.  Valid data returns [] after a single C-level decode.
+    """
+    problems = []
+    try:
+        data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # The decoder accepted everything before e.start, so diagnosis can
+        # begin at the sequence containing the first bad byte rather than
+        # at the top of the file.
+        first = e.start
+        while first > 0 and (data[first] & 0xC0) == 0x80:
+            first -= 1
+        # Walk the rest of the file one UTF-8 sequence at a time; any byte
+        # that does not start a well-formed sequence is a problem, and the
+        # continuation bytes trailing it are skipped to resync.  The line
+        # number is tracked incrementally rather than recounted from the
+        # start of the file.
+        line = 1
+        line_start = 0
+        pos = 0
+        for m in UTF8_SEQUENCE_RE.finditer(data, first):
+            if m.group(1) is None:
+                continue
+            i = m.start()
+            b = data[i]
+            newlines = data.count(b'\n', pos, i)
+            if newlines:
+                line += newlines
+                line_start = data.rfind(b'\n', pos, i) + 1
+            pos = i
+            line_end = data.find(b'\n', i)
+            if line_end == -1:
+                line_end = len(data)
+            context = data[line_start:line_end].decode('iso-8859-1').strip()
+            problems.append({
+                'line': line,
+                'col': i - line_start,
+                'byte': f'0x{b:02x}',
+                'char_iso': bytes([b]).decode('iso-8859-1'),
+                'context': context,
+            })
+    return problems
+
+
+def load_cache(path=CACHE_PATH):
+    """Return the {abspath: [size, mtime_ns, verdict]} cache, or {} if unusable."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, path=CACHE_PATH):
+    """Merge cache into the one on disk and write it atomically.
+
+    Another run may have saved since this one loaded, so the file is read
+    again first and each entry merged with merge_entry(); the result is
+    dumped to a temp file, then os.replace()d.
+    """
+    merged = load_cache(path)
+    for key, entry in cache.items():
+        merged[key] = merge_entry(merged.get(key), entry)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(merged, f)
+    os.replace(tmp, path)
+
+
+def merge_entry(old, new):
+    """Return whichever of two cache entries for one file should be kept.
+
+    The entry for the newer version of the file (larger mtime) wins.  For
+    the same version, a 'fixed' mark is never replaced by 'latin1', just as
+    in record_verdict().
+    """
+    if old is None or new[1] > old[1]:
+        return new
+    if new[:2] != old[:2]:
+        return old
+    if old[2] == 'fixed' and new[2] == 'latin1':
+        return old
+    return new
+
+
+def file_stamp(fpath):
+    """Return [size, mtime_ns] identifying this version of fpath.
+
+    Returns None if fpath cannot be stat'ed (a dangling symlink, say); no
+    verdict is cached or recorded for such a file.
+    """
+    try:
+        st = os.stat(fpath)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def cached_verdict(cache, key, stamp):
+    """Return the cached verdict for key if its stamp still matches, else None."""
+    entry = cache.get(key)
+    if entry is not None and entry[:2] == stamp:
+        return entry[2]
+    return None
+
+
+def record_verdict(cache, key, stamp, verdict):
+    """Store verdict for key, keeping the 'fixed' mark of an unchanged file.
+
+    A fixed file still classifies as 'latin1', so without this a later scan
+    or verify would erase the mark that stops it being converted twice.
+    Nothing is stored if stamp is None.
+    """
+    if stamp is None:
+        return
+    if verdict != 'latin1' or cached_verdict(cache, key, stamp) != 'fixed':
+        cache[key] = stamp + [verdict]
+
+
+def split_cached(pairs, cache, skip):
+    """Split (fpath, relpath) pairs on the verdicts cached for them.
+
+    fpath must be absolute, since it is the cache key.  Each file is
+    stat'ed once.  Files whose cached verdict is in skip need no work and
+    are only counted; the rest are returned with their cached verdict, or
+    None, to be processed.  A file that cannot be stat'ed has no verdict,
+    so it is passed on and its worker reports the error.
+
+    Returns (todo, skipped, stamps): todo lists (fpath, relpath, verdict),
+    skipped is a Counter of the skipped verdicts, and stamps maps each
+    fpath to its file_stamp() for record_verdict().
+    """
+    todo = []
+    skipped = Counter()
+    stamps = {}
+    for fpath, relpath in pairs:
+        stamps[fpath] = stamp = file_stamp(fpath)
+        verdict = cached_verdict(cache, fpath, stamp)
+        if verdict in skip:
+            skipped[verdict] += 1
+        else:
+            todo.append((fpath, relpath, verdict))
+    return todo, skipped, stamps
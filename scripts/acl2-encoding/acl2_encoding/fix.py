@@ -0,0 +1,427 @@
+"""Convert ISO-8859-1 non-ASCII bytes in ACL2 comment lines to UTF-8.
+
+Strategy:
+  1. Skip files that are already valid UTF-8 (they need no conversion).
+  2. For remaining files (assumed ISO-8859-1), find non-ASCII bytes in
+     ';' line comments and replace each byte with its UTF-8 equivalent.
+     ISO-8859-1 byte values 0x80-0xFF map directly to Unicode code points
+     U+0080-U+00FF, so the conversion is just chr(byte).encode('utf-8').
+  3. Non-ASCII bytes in code (strings, symbols) are left untouched and
+     reported as warnings since they may have semantic meaning.
+
+Excluded by default:
+  - books/quicklisp/  (third-party code, already valid UTF-8)
+  - books/projects/python/  (test data)
+
+Files already known to be ASCII or valid UTF-8 from an earlier run (same
+size and mtime) are skipped using the cache in
+~/.cache/acl2-encoding/scan.json.  So are files already rewritten by an
+earlier run whose code still holds non-ASCII bytes: converting their
+comments a second time would double-encode them.  With --no-cache, or
+once the cache is deleted, nothing protects those files, so do not rerun
+this script on an already-fixed tree without --dry-run.  The same goes
+for a run interrupted with Ctrl-C: files are reported, and marked, in
+batches of 64, so a batch cut short can leave rewritten files unmarked.
+
+Usage:
+    python3 fix-comment-encoding.py [--dry-run] [--report REPORT.json] [ACL2_DIR]
+    python3 acl2-encoding.py fix [--dry-run] [--report REPORT.json] [ACL2_DIR]
+
+    --dry-run       Show what would be changed without modifying files
+    --report FILE   Read scan report from FILE to select files to process
+    --no-cache      Neither read nor update the verdict cache
+    ACL2_DIR        defaults to /workspaces/pup/external/acl2
+"""
+
+import os
+import re
+import sys
+import bisect
+import argparse
+import json
+import shutil
+import tempfile
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import (
+    classify, file_stamp, find_source_files, load_cache, non_ascii_offsets,
+    quick_classify, record_verdict, save_cache, split_cached, with_relpaths,
+)
+
+
+# Directories to exclude (relative to ACL2_DIR, with trailing /)
+EXCLUDE_DIRS = [
+    'books/quicklisp/',
+]
+EXCLUDE_PREFIXES = tuple(EXCLUDE_DIRS)  # for a single str.startswith() call
+
+# process_file() skip reasons and the cache verdicts they imply
+SKIP_VERDICTS = {
+    'no non-ASCII bytes': 'ascii',
+    'already valid UTF-8': 'utf8',
+}
+
+# Lexer tokens that can change state outside strings and comments.  A
+# newline changes nothing here, so the search runs across whole stretches
+# of plain code lines without returning to Python.
+CODE_TOKEN_RE = re.compile(rb'[";]|#\|')
+
+# Inside a string: an escape (the backslash applies to the next ASCII
+# byte), the closing quote, or the end of the line
+STRING_TOKEN_RE = re.compile(rb'\\[\x80-\xff]*[^\x80-\xff\n]|["\n]')
+
+# End of a block comment
+BLOCK_END_RE = re.compile(rb'\|#')
+
+
+def find_comment_spans(data, limit=None):
+    """Locate the ';' line comments and '#|...|#' block comments in data.
+
+    Returns two parallel sorted lists (starts, ends) of half-open byte
+    intervals.  Follows the same rules as a byte-at-a-time lexer: strings
+    and line comments end at the end of the line, a backslash escapes the
+    next ASCII byte inside a string, and block comments do not nest.
+    Only the bytes that can change state are visited; the regex engine
+    skips everything else.  Lexing stops once it passes offset limit
+    (default: the end of data), so spans starting after limit may be
+    missing.
+    """
+    starts = []
+    ends = []
+    size = len(data)
+    limit = size if limit is None else limit
+    pos = 0
+    in_block_comment = False
+
+    while pos < limit:
+        if in_block_comment:
+            m = BLOCK_END_RE.search(data, pos)
+            if m is None:
+                break
+            ends.append(m.end())
+            in_block_comment = False
+            # The closing '#' may also open a new block comment ("|#|")
+            pos = m.end() - 1
+            continue
+
+        m = CODE_TOKEN_RE.search(data, pos)
+        if m is None:
+            break
+        tok = m.group()
+        if tok == b';':
+            eol = data.find(b'\n', m.end())
+            if eol == -1:
+                eol = size
+            starts.append(m.start())
+            ends.append(eol)
+            pos = eol
+        elif tok == b'#|':
+            starts.append(m.start())
+            in_block_comment = True
+            # The opening '|' may also close the comment ("#|#")
+            pos = m.end() - 1
+        else:
+            # Opening '"': skip escapes until the closing quote or newline
+            pos = m.end()
+            while True:
+                m = STRING_TOKEN_RE.search(data, pos)
+                if m is None:
+                    pos = size
+                    break
+                pos = m.end()
+                if m.group() in (b'"', b'\n'):
+                    break
+
+    if in_block_comment:
+        ends.append(size)  # unterminated, or lexing stopped at limit
+    return starts, ends
+
+
+def in_spans(starts, ends, offset):
+    """Return True if offset falls inside one of the (starts, ends) spans."""
+    k = bisect.bisect_right(starts, offset) - 1
+    return k >= 0 and offset < ends[k]
+
+
+def convert_comments(data, offsets):
+    """Convert the non-ASCII bytes of ISO-8859-1 data that lie in comments.
+
+    offsets lists the position of every non-ASCII byte in data, as from
+    non_ascii_offsets(); they drive everything here.  Returns (parts, changes,
+    warnings): parts are the slices of the converted file, in order.
+    """
+    # Comment state only matters up to the last offset, so the lexer stops
+    # there instead of running to the end of the file.
+    comment_starts, comment_ends = find_comment_spans(data, offsets[-1] + 1)
+    changes = []
+    warnings = []
+    parts = []
+    cursor = 0
+    line_no = 1
+    line_start = 0
+    pos = 0
+    context_str = None
+
+    for i in offsets:
+        newlines = data.count(b'\n', pos, i)
+        if newlines:
+            line_no += newlines
+            line_start = data.rfind(b'\n', pos, i) + 1
+            context_str = None
+        pos = i
+
+        b = data[i]
+        iso_char = chr(b)  # ISO-8859-1 -> Unicode (same code point)
+        if in_spans(comment_starts, comment_ends, i):
+            # Convert to UTF-8 in the output
+            parts.append(data[cursor:i])
+            parts.append(iso_char.encode('utf-8'))
+            cursor = i + 1
+            changes.append({
+                'line': line_no,
+                'col': i - line_start + 1,
+                'byte': f'0x{b:02x}',
+                'char': iso_char,
+            })
+        else:
+            # Non-ASCII in code — leave as-is, warn
+            if context_str is None:
+                line_end = data.find(b'\n', i)
+                if line_end == -1:
+                    line_end = len(data)
+                context_str = data[line_start:line_end].decode('iso-8859-1').strip()
+                if len(context_str) > 80:
+                    context_str = context_str[:80] + '...'
+            warnings.append({
+                'line': line_no,
+                'col': i - line_start + 1,
+                'byte': f'0x{b:02x}',
+                'char': iso_char,
+                'context': context_str,
+                'reason': 'non-ASCII in code (not in comment)',
+            })
+
+    parts.append(data[cursor:])
+    return parts, changes, warnings
+
+
+def write_parts(fpath, parts):
+    """Replace the contents of fpath with the concatenation of parts.
+
+    Streams the slices into a temp file next to the original and swaps it
+    into place: no joined copy of the new contents is built, and an
+    interrupted run never leaves a half-written source file.
+    """
+    target = os.path.realpath(fpath)
+    with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(target),
+            prefix=f'.{os.path.basename(target)}.',
+            delete=False) as tf:
+        try:
+            tf.writelines(parts)
+        except BaseException:
+            os.unlink(tf.name)
+            raise
+    # Don't leave the hidden temp file in the source tree if the swap fails
+    try:
+        shutil.copymode(target, tf.name)
+        os.replace(tf.name, target)
+    except BaseException:
+        os.unlink(tf.name)
+        raise
+
+
+def process_file(fpath, dry_run=False):
+    """Process a single file, converting ISO-8859-1 non-ASCII in comments to UTF-8.
+
+    Returns dict with changes made, warnings, skip reason (if any), and the
+    error message if the file could not be processed.  A file is only
+    reported as modified once it has been rewritten.
+    """
+    try:
+        # Check if there are any non-ASCII bytes at all; if there are, data
+        # holds the whole file
+        data = quick_classify(fpath)[1]
+        if data is None:
+            return {'changes': [], 'warnings': [], 'modified': False,
+                    'skipped': 'no non-ASCII bytes', 'error': None}
+
+        verdict = classify(data)[0]
+
+        # If file is already valid UTF-8, skip it — the non-ASCII bytes are
+        # already properly encoded multi-byte sequences (e.g., curly quotes,
+        # CJK characters, math symbols).
+        if verdict == 'utf8':
+            return {'changes': [], 'warnings': [], 'modified': False,
+                    'skipped': 'already valid UTF-8', 'error': None}
+
+        parts, changes, warnings = convert_comments(data,
+                                                    non_ascii_offsets(data))
+        modified = len(changes) > 0
+
+        if modified and not dry_run:
+            write_parts(fpath, parts)
+
+        return {'changes': changes, 'warnings': warnings,
+                'modified': modified, 'skipped': None, 'error': None}
+    except Exception as e:
+        return {'changes': [], 'warnings': [], 'modified': False,
+                'skipped': None, 'error': str(e)}
+
+
+def print_changes(relpath, result, dry_run):
+    """Print the changes and warnings in one process_file() result."""
+    if result['changes']:
+        action = 'Would change' if dry_run else 'Changed'
+        print(f"  {action} {relpath}: {len(result['changes'])} byte(s)",
+              file=sys.stderr)
+        for c in result['changes']:
+            print(f"    Line {c['line']}:{c['col']}: "
+                  f"{c['byte']} '{c['char']}' -> UTF-8",
+                  file=sys.stderr)
+
+    for w in result['warnings']:
+        print(f"  WARNING {relpath}:{w['line']}:{w['col']}: "
+              f"{w['reason']} ({w['byte']} '{w['char']}')",
+              file=sys.stderr)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('acl2_dir', nargs='?',
+                        default='/workspaces/pup/external/acl2',
+                        help='ACL2 source directory')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Show changes without modifying files')
+    parser.add_argument('--report', type=str,
+                        help='Use scan report JSON to select files to process')
+    parser.add_argument('--include-excluded', action='store_true',
+                        help='Process files in normally-excluded directories')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Neither read nor update the verdict cache')
+    args = parser.parse_args(argv)
+
+    acl2_dir = os.path.abspath(args.acl2_dir)
+    acl2_prefix = os.path.join(acl2_dir, '')
+
+    # Build the list of (absolute path, path relative to acl2_dir) pairs;
+    # the relative path is computed once here and carried through
+    if args.report:
+        with open(args.report) as f:
+            report = json.load(f)
+        file_list = [(acl2_prefix + relpath, relpath)
+                     for relpath in sorted(report['results'])]
+    else:
+        # Excluded directories are pruned during the walk, so only report
+        # lists need the filtering below
+        file_list = with_relpaths(acl2_dir, find_source_files(
+            acl2_dir, () if args.include_excluded else EXCLUDE_PREFIXES))
+        if not args.include_excluded:
+            print(f"Excluded directories: {', '.join(EXCLUDE_DIRS)}",
+                  file=sys.stderr)
+
+    # Apply exclusions to files named in the report
+    if args.report and not args.include_excluded:
+        excluded_count = 0
+        filtered = []
+        for fpath, relpath in file_list:
+            if relpath.startswith(EXCLUDE_PREFIXES):
+                excluded_count += 1
+            else:
+                filtered.append((fpath, relpath))
+        file_list = filtered
+        if excluded_count:
+            print(f"Excluded {excluded_count} file(s) in: "
+                  f"{', '.join(EXCLUDE_DIRS)}", file=sys.stderr)
+
+    print(f"Processing {len(file_list)} file(s)...", file=sys.stderr)
+    if args.dry_run:
+        print("DRY RUN — no files will be modified\n", file=sys.stderr)
+
+    all_changes = {}
+    all_warnings = {}
+
+    # Unchanged files already known to be ASCII or UTF-8, or already
+    # fixed, need no work
+    cache = {} if args.no_cache else load_cache()
+    to_process, skipped, stamps = split_cached(
+        file_list, cache, ('ascii', 'utf8', 'fixed'))
+    skipped_clean = skipped['ascii']
+    skipped_utf8 = skipped['utf8']
+    skipped_fixed = skipped['fixed']
+
+    # Files are independent, so process them in parallel.  Results come
+    # back in file order, 64 files at a time, and each is recorded here in
+    # the parent as it arrives; the cache is saved even if the run fails or
+    # is interrupted, so the marks of files already rewritten are kept.
+    worker = functools.partial(process_file, dry_run=args.dry_run)
+    try:
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(worker,
+                                   [fpath for fpath, _, _ in to_process],
+                                   chunksize=64)
+
+            for (fpath, relpath, _), result in zip(to_process, results):
+                if result['error'] is not None:
+                    print(f"  Error processing {relpath}: {result['error']}",
+                          file=sys.stderr)
+                    continue
+
+                if result['modified'] and not args.dry_run:
+                    # Mark the rewritten file so it is never converted
+                    # again; it is valid UTF-8 now unless non-ASCII bytes
+                    # remain in its code
+                    record_verdict(cache, fpath, file_stamp(fpath),
+                                   'fixed' if result['warnings'] else 'utf8')
+                else:
+                    record_verdict(cache, fpath, stamps[fpath],
+                                   SKIP_VERDICTS.get(result['skipped'],
+                                                     'latin1'))
+
+                if result.get('skipped') == 'already valid UTF-8':
+                    skipped_utf8 += 1
+                    continue
+                if result.get('skipped') == 'no non-ASCII bytes':
+                    skipped_clean += 1
+                    continue
+
+                if result['changes']:
+                    all_changes[relpath] = result['changes']
+                if result['warnings']:
+                    all_warnings[relpath] = result['warnings']
+                print_changes(relpath, result, args.dry_run)
+    finally:
+        if not args.no_cache:
+            save_cache(cache)
+
+    # Summary
+    total_changes = sum(len(v) for v in all_changes.values())
+    total_warnings = sum(len(v) for v in all_warnings.values())
+    print(f"\nSummary:", file=sys.stderr)
+    print(f"  Files processed: {len(file_list)}", file=sys.stderr)
+    print(f"  Skipped (already UTF-8): {skipped_utf8}", file=sys.stderr)
+    print(f"  Skipped (all ASCII): {skipped_clean}", file=sys.stderr)
+    print(f"  Skipped (already fixed): {skipped_fixed}", file=sys.stderr)
+    print(f"  Files {'to change' if args.dry_run else 'changed'}: "
+          f"{len(all_changes)}", file=sys.stderr)
+    print(f"  Total bytes converted: {total_changes}", file=sys.stderr)
+    print(f"  Warnings (non-ASCII in code): {total_warnings}", file=sys.stderr)
+
+    report_out = {
+        'dry_run': args.dry_run,
+        'files_processed': len(file_list),
+        'skipped_utf8': skipped_utf8,
+        'skipped_clean': skipped_clean,
+        'skipped_fixed': skipped_fixed,
+        'files_changed': len(all_changes),
+        'total_replacements': total_changes,
+        'total_warnings': total_warnings,
+        'changes': all_changes,
+        'warnings': all_warnings,
+    }
+    json.dump(report_out, sys.stdout, indent=2, ensure_ascii=False)
+    print()
@@ -0,0 +1,204 @@
+"""Fix and verify ACL2 source encodings in a single pass over the tree.
+
+Equivalent to running fix-comment-encoding.py and then verify-encoding.py,
+but each file is opened once: it is classified, its comments are
+converted if it is ISO-8859-1, and the converted bytes are checked for
+remaining non-UTF-8 bytes in memory, without a second walk of the tree.
+Files of up to CHUNK_SIZE bytes are read in a single call; see
+quick_classify() in core.py for larger ones.
+
+Nothing is written unless --apply is given; without it the run reports
+the changes it would make and the problems that would remain, and is
+safe to repeat.  Files under the fix's excluded directories are verified
+but not fixed.
+
+Files already known to be ASCII or valid UTF-8 from an earlier run (same
+size and mtime) are skipped using the cache in
+~/.cache/acl2-encoding/scan.json.  Files rewritten by an earlier --apply
+(or by fix-comment-encoding.py) are verified but never converted again,
+since their comments are already UTF-8.  That mark lives in the cache, so
+with --no-cache, or once the cache is deleted, a second --apply on a
+fixed tree would double-encode those comments, as it would after an
+--apply interrupted with Ctrl-C: files are reported, and marked, in
+batches of 64, so a batch cut short can leave rewritten files unmarked.
+
+Usage:
+    python3 acl2-encoding.py all [--apply] [--include-excluded] [--no-cache] [ACL2_DIR]
+
+    --apply         Write the converted files; by default nothing is modified
+    --include-excluded
+                    Fix files in the excluded directories too
+    --no-cache      Neither read nor update the verdict cache
+    ACL2_DIR        defaults to /workspaces/pup/external/acl2
+
+Writes a JSON report of changes, warnings, and remaining problems to
+stdout, and exits 1 if any non-UTF-8 bytes remain or a file could not be
+processed.
+"""
+
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import (
+    check_utf8, classify, diagnose_utf8, file_stamp, find_source_files,
+    load_cache, non_ascii_offsets, quick_classify, record_verdict,
+    save_cache, split_cached, with_relpaths,
+)
+from .fix import (
+    EXCLUDE_DIRS, EXCLUDE_PREFIXES, convert_comments, print_changes,
+    write_parts,
+)
+from .verify import print_problems
+
+
+def run_file(job, dry_run=False):
+    """Classify, fix, and verify one file, opening it only once.
+
+    job is (fpath, fix): comments are converted only if fix is true.
+    Returns a dict with the file's original 'verdict', the fix's 'changes',
+    'warnings', and 'modified', the 'problems' left afterwards, and the
+    'error' message if the file could not be processed.  A file is only
+    reported as modified once it has been rewritten.
+    """
+    fpath, fix = job
+    result = {'verdict': 'ascii', 'changes': [], 'warnings': [],
+              'modified': False, 'problems': [], 'error': None}
+    try:
+        data = quick_classify(fpath)[1]
+        if data is None:
+            return result
+
+        if not fix:
+            result['verdict'], result['problems'] = check_utf8(data)
+            return result
+
+        result['verdict'] = verdict = classify(data)[0]
+        if verdict != 'latin1':
+            return result
+
+        parts, result['changes'], result['warnings'] = convert_comments(
+            data, non_ascii_offsets(data))
+        if result['changes']:
+            data = b''.join(parts)
+        result['problems'] = diagnose_utf8(data)
+        if result['changes']:
+            if not dry_run:
+                write_parts(fpath, parts)
+            result['modified'] = True
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('acl2_dir', nargs='?',
+                        default='/workspaces/pup/external/acl2',
+                        help='ACL2 source directory')
+    parser.add_argument('--apply', action='store_true',
+                        help='Write the converted files')
+    parser.add_argument('--include-excluded', action='store_true',
+                        help='Fix files in normally-excluded directories')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Neither read nor update the verdict cache')
+    args = parser.parse_args(argv)
+    dry_run = not args.apply
+
+    acl2_dir = os.path.abspath(args.acl2_dir)
+    pairs = with_relpaths(acl2_dir, find_source_files(acl2_dir))
+
+    print(f"Processing {len(pairs)} file(s)...", file=sys.stderr)
+    if not args.include_excluded:
+        print(f"Not fixing excluded directories: {', '.join(EXCLUDE_DIRS)}",
+              file=sys.stderr)
+    if dry_run:
+        print("DRY RUN — no files will be modified (use --apply)\n",
+              file=sys.stderr)
+
+    # Unchanged files already known to be ASCII or UTF-8 need no work, and
+    # fixed files must only be verified
+    cache = {} if args.no_cache else load_cache()
+    to_process, skipped, stamps = split_cached(pairs, cache, ('ascii', 'utf8'))
+    ok_count = sum(skipped.values())
+    jobs = [(fpath, verdict != 'fixed' and (
+                args.include_excluded
+                or not relpath.startswith(EXCLUDE_PREFIXES)))
+            for fpath, relpath, verdict in to_process]
+
+    # Results come back in file order, 64 files at a time, and each is
+    # recorded as it arrives; the cache is saved even if the run fails or
+    # is interrupted, so the marks of files already rewritten are kept
+    all_changes = {}
+    all_warnings = {}
+    problem_files = {}
+    error_count = 0
+    try:
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(run_file, jobs, [dry_run] * len(jobs),
+                                   chunksize=64)
+
+            for (fpath, relpath, _), result in zip(to_process, results):
+                if result['error'] is not None:
+                    print(f"  Error processing {relpath}: {result['error']}",
+                          file=sys.stderr)
+                    error_count += 1
+                    continue
+
+                if result['modified'] and not dry_run:
+                    # Mark the rewritten file so it is never converted again
+                    verdict = 'fixed' if result['problems'] else 'utf8'
+                    record_verdict(cache, fpath, file_stamp(fpath), verdict)
+                else:
+                    record_verdict(cache, fpath, stamps[fpath],
+                                   result['verdict'])
+
+                if result['changes']:
+                    all_changes[relpath] = result['changes']
+                if result['warnings']:
+                    all_warnings[relpath] = result['warnings']
+                print_changes(relpath, result, dry_run)
+                if result['problems']:
+                    problem_files[relpath] = result['problems']
+                else:
+                    ok_count += 1
+    finally:
+        if not args.no_cache:
+            save_cache(cache)
+
+    total_changes = sum(len(v) for v in all_changes.values())
+    total_warnings = sum(len(v) for v in all_warnings.values())
+    total_problems = sum(len(v) for v in problem_files.values())
+    print(f"\nSummary:", file=sys.stderr)
+    print(f"  Files {'to change' if dry_run else 'changed'}: "
+          f"{len(all_changes)}", file=sys.stderr)
+    print(f"  Total bytes converted: {total_changes}", file=sys.stderr)
+    print(f"  Warnings (non-ASCII in code): {total_warnings}", file=sys.stderr)
+    print(f"  {ok_count} files are valid UTF-8", file=sys.stderr)
+    print(f"  {len(problem_files)} files have non-UTF-8 bytes "
+          f"({total_problems} total)", file=sys.stderr)
+
+    if problem_files:
+        print_problems(problem_files)
+
+    report_out = {
+        'dry_run': dry_run,
+        'files_processed': len(pairs),
+        'files_changed': len(all_changes),
+        'total_replacements': total_changes,
+        'total_warnings': total_warnings,
+        'total_problems': total_problems,
+        'changes': all_changes,
+        'warnings': all_warnings,
+        'problems': problem_files,
+    }
+    json.dump(report_out, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+    # Exit code: 0 if all clean, 1 if problems remain or files were missed
+    sys.exit(0 if not problem_files and not error_count else 1)
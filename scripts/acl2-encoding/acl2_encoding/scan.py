@@ -0,0 +1,190 @@
+"""Scan ACL2 source files for non-ASCII bytes.
+
+Reports every non-ASCII byte found in .lisp, .lsp, .acl2, and .cl files
+under the ACL2 source tree. Bytes are decoded as ISO-8859-1 for display
+since that's ACL2's native encoding.
+
+Files already known to be pure ASCII from an earlier run (same size and
+mtime) are skipped using the cache in ~/.cache/acl2-encoding/scan.json.
+
+Usage:
+    python3 scan-non-ascii.py [--json-lines] [--no-cache] [ACL2_DIR]
+    python3 acl2-encoding.py scan [--json-lines] [--no-cache] [ACL2_DIR]
+
+    --json-lines    Stream one {"file": ..., "hits": [...]} record per line
+                    as files are scanned, instead of one report at the end
+    --no-cache      Neither read nor update the verdict cache
+    ACL2_DIR        defaults to /workspaces/pup/external/acl2
+"""
+
+import os
+import sys
+import json
+import argparse
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import (
+    ASCII_BYTES, classify, find_source_files, load_cache, quick_classify,
+    record_verdict, save_cache, split_cached, with_relpaths,
+)
+
+
+def scan_data(data, offsets):
+    """Return the non-ASCII bytes in data as columns rather than per-hit dicts.
+
+    offsets lists their positions, as from classify(data, want_offsets=True).
+
+    The result is {'line': array, 'col': array, 'byte': bytes, 'context':
+    {line: str}}: 'line', 'col' and 'byte' are parallel, one entry per hit,
+    and 'context' holds the stripped text of each line with a hit.  Use
+    hit_dicts() to expand it for output.
+    """
+    hits = {'line': array('l'), 'col': array('l'), 'byte': b'', 'context': {}}
+    # Reduce the file to just its non-ASCII bytes in one C-level pass; this
+    # is the 'byte' column, and its length sizes the other two.
+    hits['byte'] = non_ascii = data.translate(None, ASCII_BYTES)
+    if not non_ascii:
+        return hits
+    hits['line'] = lines = array('l', [0]) * len(non_ascii)
+    hits['col'] = cols = array('l', [0]) * len(non_ascii)
+    contexts = hits['context']
+    # Walk forward once, advancing the line count only over the bytes
+    # between consecutive hits, so each byte is examined a bounded number
+    # of times instead of re-slicing data[:i] for every hit.
+    line = 1
+    line_start = 0
+    pos = 0
+    for k, i in enumerate(offsets):
+        newlines = data.count(b'\n', pos, i)
+        if newlines:
+            line += newlines
+            line_start = data.rfind(b'\n', pos, i) + 1
+        pos = i
+        if line not in contexts:
+            # Get context: the full line containing this byte
+            line_end = data.find(b'\n', i)
+            if line_end == -1:
+                line_end = len(data)
+            contexts[line] = data[line_start:line_end].decode('iso-8859-1').strip()
+        lines[k] = line
+        cols[k] = i - line_start
+    return hits
+
+
+def hit_dicts(hits):
+    """Expand columnar hits from scan_data() into the report's per-hit dicts."""
+    contexts = hits['context']
+    return [{
+        'line': line,
+        'col': col,
+        'byte': b,
+        'hex': f'0x{b:02x}',
+        'char': chr(b),
+        'context': contexts[line],
+    } for line, col, b in zip(hits['line'], hits['col'], hits['byte'])]
+
+
+def try_scan_file(fpath):
+    """Return (hits, None, verdict) for fpath, or (None, error, None) on failure.
+
+    The file is opened once; its verdict comes from the same bytes as its
+    hits.
+    """
+    try:
+        data = quick_classify(fpath)[1]
+        if data is None:
+            return scan_data(b'', []), None, 'ascii'
+        verdict, offsets = classify(data, want_offsets=True)
+        return scan_data(data, offsets), None, verdict
+    except Exception as e:
+        return None, str(e), None
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('acl2_dir', nargs='?',
+                        default='/workspaces/pup/external/acl2',
+                        help='ACL2 source directory')
+    parser.add_argument('--json-lines', action='store_true',
+                        help='Stream one JSON record per file to stdout')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Neither read nor update the verdict cache')
+    args = parser.parse_args(argv)
+    acl2_dir = args.acl2_dir
+
+    if not os.path.isdir(acl2_dir):
+        print(f"Error: {acl2_dir} is not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    # Walk from the absolute path, so each file's path is its cache key
+    abs_dir = os.path.abspath(acl2_dir)
+    files = find_source_files(abs_dir)
+    print(f"Scanning {len(files)} files under {acl2_dir}...", file=sys.stderr)
+    pairs = with_relpaths(abs_dir, files)
+
+    results = {}
+    byte_counts = {}  # relpath -> {byte value: count}, for the summary
+    total_hits = 0
+
+    # Unchanged files already known to be pure ASCII have no hits to report
+    cache = {} if args.no_cache else load_cache()
+    to_scan, _, stamps = split_cached(pairs, cache, ('ascii',))
+
+    # Files are independent, so scan them in parallel; results come back
+    # in file order and are consumed here in the parent as they arrive
+    with ProcessPoolExecutor() as executor:
+        scanned = executor.map(try_scan_file,
+                               [fpath for fpath, _, _ in to_scan],
+                               chunksize=64)
+
+        for (fpath, relpath, _), (hits, error, verdict) in zip(to_scan,
+                                                               scanned):
+            if error is not None:
+                print(f"  Error reading {fpath}: {error}", file=sys.stderr)
+                continue
+
+            record_verdict(cache, fpath, stamps[fpath], verdict)
+            if not hits['byte']:
+                continue
+
+            total_hits += len(hits['byte'])
+            # Group by unique byte values
+            byte_counts[relpath] = Counter(hits['byte'])
+            if args.json_lines:
+                # Write the record now rather than holding every file's
+                # hits until the end
+                json.dump({'file': relpath, 'hits': hit_dicts(hits)},
+                          sys.stdout, ensure_ascii=True)
+                sys.stdout.write('\n')
+            else:
+                results[relpath] = hits
+
+    if not args.no_cache:
+        save_cache(cache)
+
+    # Print summary to stderr
+    print(f"\nFound {total_hits} non-ASCII byte(s) in {len(byte_counts)} file(s):\n", file=sys.stderr)
+    for relpath, counts in sorted(byte_counts.items()):
+        print(f"  {relpath}: {sum(counts.values())} non-ASCII byte(s)", file=sys.stderr)
+        for b, count in sorted(counts.items()):
+            print(f"    0x{b:02x} '{chr(b)}' x{count}", file=sys.stderr)
+
+    if args.json_lines:
+        return
+
+    # Print full JSON report to stdout
+    report = {
+        'acl2_dir': acl2_dir,
+        'files_scanned': len(files),
+        'files_with_non_ascii': len(results),
+        'total_non_ascii_bytes': total_hits,
+        'results': {relpath: hit_dicts(hits)
+                    for relpath, hits in results.items()},
+    }
+    json.dump(report, sys.stdout, indent=2, ensure_ascii=True)
+    print()
@@ -0,0 +1,114 @@
+"""Verify that ACL2 source files are valid UTF-8 after encoding fixes.
+
+Checks that all .lisp, .lsp, .acl2, and .cl files can be read as UTF-8.
+Reports any remaining non-UTF-8 bytes (which should be in code, not comments).
+
+Files already known to be valid UTF-8 from an earlier run (same size and
+mtime) are skipped using the cache in ~/.cache/acl2-encoding/scan.json.
+
+Usage:
+    python3 verify-encoding.py [--no-cache] [ACL2_DIR]
+    python3 acl2-encoding.py verify [--no-cache] [ACL2_DIR]
+
+    --no-cache      Neither read nor update the verdict cache
+"""
+
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import (
+    check_utf8, find_source_files, load_cache, quick_classify,
+    record_verdict, save_cache, split_cached, with_relpaths,
+)
+
+
+def check_file(fpath):
+    """Return (problems, None, verdict) for fpath, or (None, error, None) on failure.
+
+    The file is opened and decoded once.
+    """
+    try:
+        data = quick_classify(fpath)[1]
+        if data is None:
+            return [], None, 'ascii'
+        verdict, problems = check_utf8(data)
+        return problems, None, verdict
+    except Exception as e:
+        return None, str(e), None
+
+
+def print_problems(problem_files):
+    """Print the per-file problem listing for {relpath: problems}."""
+    print(f"\nFiles with remaining non-UTF-8 bytes:", file=sys.stderr)
+    for relpath, problems in sorted(problem_files.items()):
+        print(f"  {relpath}:", file=sys.stderr)
+        for p in problems:
+            print(f"    Line {p['line']}, col {p['col']}: "
+                  f"{p['byte']} '{p['char_iso']}' — {p['context'][:80]}",
+                  file=sys.stderr)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('acl2_dir', nargs='?',
+                        default='/workspaces/pup/external/acl2',
+                        help='ACL2 source directory')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Neither read nor update the verdict cache')
+    args = parser.parse_args(argv)
+    acl2_dir = args.acl2_dir
+
+    # Walk from the absolute path, so each file's path is its cache key
+    abs_dir = os.path.abspath(acl2_dir)
+    files = find_source_files(abs_dir)
+    pairs = with_relpaths(abs_dir, files)
+
+    print(f"Verifying {len(files)} files for UTF-8 validity...", file=sys.stderr)
+
+    problem_files = {}
+    error_count = 0
+
+    # Unchanged files already known to be ASCII or UTF-8 need no checking
+    cache = {} if args.no_cache else load_cache()
+    to_check, skipped, stamps = split_cached(pairs, cache, ('ascii', 'utf8'))
+    ok_count = sum(skipped.values())
+
+    # Files are independent, so verify them in parallel
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(check_file,
+                                    [fpath for fpath, _, _ in to_check],
+                                    chunksize=64))
+
+    for (fpath, relpath, _), (problems, error, verdict) in zip(to_check,
+                                                               results):
+        if error is not None:
+            print(f"  Error reading {fpath}: {error}", file=sys.stderr)
+            error_count += 1
+            continue
+
+        record_verdict(cache, fpath, stamps[fpath], verdict)
+        if problems:
+            problem_files[relpath] = problems
+        else:
+            ok_count += 1
+
+    if not args.no_cache:
+        save_cache(cache)
+
+    total_problems = sum(len(v) for v in problem_files.values())
+
+    print(f"\nResults:", file=sys.stderr)
+    print(f"  {ok_count} files are valid UTF-8", file=sys.stderr)
+    print(f"  {len(problem_files)} files have non-UTF-8 bytes "
+          f"({total_problems} total)", file=sys.stderr)
+
+    if problem_files:
+        print_problems(problem_files)
+
+    # Exit code: 0 if all clean, 1 if problems remain or files were missed
+    sys.exit(0 if not problem_files and not error_count else 1)
@@ -12,6 +12,17 @@
 #   4. Apply:   python3 fix-comment-encoding.py [ACL2_DIR] > changes.json
 #   5. Verify:  python3 verify-encoding.py [ACL2_DIR]
 #
+# Steps 3-5 can also be run together, opening each file only once:
+#               python3 acl2-encoding.py all [ACL2_DIR]          (dry run)
+#               python3 acl2-encoding.py all --apply [ACL2_DIR] > changes.json
+# Without --apply, "all" writes nothing and is safe to rerun as a check.
+# Files written by --apply (or by step 4) are marked in the verdict cache
+# (~/.cache/acl2-encoding/scan.json) so that a rerun verifies them but
+# never converts their comments again.  Do not rerun step 4 or
+# "all --apply" with --no-cache or after deleting the cache: files with
+# non-ASCII bytes left in code would get their comments double-encoded.
+# acl2-encoding.py also takes scan, fix, and verify as subcommands.
+#
 # The scripts should be run from the pup repo root on a fresh branch
 # off of the ACL2 master branch.
 